@@ -65,6 +65,10 @@ class DeepgramTranscriber:
             input=True,
             frames_per_buffer=chunk,
             input_device_index=device_index,
+            # Callback mode: PortAudio's own thread delivers each chunk, so no
+            # Python thread has to poll stream.read()
+            stream_callback=self._on_audio,
+            start=False,
         )
         self.audio_queue = queue.Queue()
 
@@ -78,15 +82,10 @@ class DeepgramTranscriber:
         """Set a callback function to handle transcribed commands, e.g., send to LLM."""
         self.command_callback = callback
 
-    def _stream_audio(self):
-        """Thread: Read mic audio and put in queue."""
-        while True:
-            try:
-                data = self.stream.read(self.chunk, exception_on_overflow=False)
-                self.audio_queue.put(data)
-            except Exception as e:
-                print(f"Audio stream error: {e}")
-                break
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: hand each captured chunk to the send loop."""
+        self.audio_queue.put(in_data)
+        return (None, pyaudio.paContinue)
 
     def _on_message(self, message: ListenV1SocketClientResponse):
         """Handle messages from Deepgram connection."""
@@ -232,7 +231,7 @@ class DeepgramTranscriber:
 
     def run(self):
         """Start threads and async loop."""
-        threading.Thread(target=self._stream_audio, daemon=True).start()
+        self.stream.start_stream()
         print("Connecting to Deepgram STT...")
         threading.Thread(target=lambda: asyncio.run(self.run_async())).start()
         # asyncio.run(self.run_async())
@@ -69,10 +69,15 @@ class ASR:
     #  Read raw mic audio
     # -----------------------
     def _stream_audio(self):
+        scale = np.float32(1.0 / 32768.0)
         while True:
             data = self.stream.read(self.chunk, exception_on_overflow=False)
-            audio = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-            self.audio_queue.put(audio)
+            # int16 view of the bytes, scaled straight into one new float32
+            # array (astype + divide allocated two per chunk)
+            pcm = np.frombuffer(data, dtype=np.int16)
+            audio = np.multiply(pcm, scale, dtype=np.float32)
+            # Keep the raw bytes for the VAD alongside the float samples
+            self.audio_queue.put((data, audio))
 
     # -----------------------
     #  Check if audio contains speech (VAD)
@@ -89,9 +94,8 @@ class ASR:
         
     #     return len(speech_timestamps) > 0
     
-    def _is_speech(self, audio_chunk):
-        # Convert float32 [-1,1] to int16
-        pcm16 = (audio_chunk * 32767).astype('int16').tobytes()
+    def _is_speech(self, pcm16):
+        # webrtcvad takes the raw int16 bytes as read from the mic
         return vad.is_speech(pcm16, sample_rate=self.sample_rate)
 
     # -----------------------
@@ -117,10 +121,10 @@ class ASR:
         audio_accum = []
 
         while True:
-            chunk = self.audio_queue.get()
+            pcm16, chunk = self.audio_queue.get()
 
             # VAD — only collect speech
-            if self._is_speech(chunk):
+            if self._is_speech(pcm16):
                 audio_accum.extend(chunk)
 
                 # Do small streaming inference every 0.5s of speech
@@ -139,7 +143,7 @@ class ASR:
                                 print("Now listening for command…")
                         else:
                             # Command stage
-                            if self._is_speech(chunk):
+                            if self._is_speech(pcm16):
                                 continue  # keep collecting
                             else:
                                 final_text = self._whisper_transcribe(np.array(audio_accum))
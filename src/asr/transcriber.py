@@ -3,7 +3,6 @@ import base64
 import os
 import queue
 import random
-import threading
 
 import numpy as np
 import pyaudio
@@ -71,7 +70,11 @@ class Transcriber:
             rate=sample_rate,
             input=True,
             frames_per_buffer=chunk,
-            input_device_index=device_index
+            input_device_index=device_index,
+            # Callback mode: PortAudio's own thread delivers each chunk, so no
+            # Python thread has to poll stream.read()
+            stream_callback=self._on_audio,
+            start=False,
         )
         self.audio_queue = queue.Queue()
         # self.audio_queue = asyncio.Queue()
@@ -84,15 +87,10 @@ class Transcriber:
         """Set a callback function to handle transcribed commands, e.g., send to LLM."""
         self.command_callback = callback
 
-    def _stream_audio(self):
-        """Thread: Read mic audio and put in queue."""
-        while True:
-            try:
-                data = self.stream.read(self.chunk, exception_on_overflow=False)
-                self.audio_queue.put(data)
-            except Exception as e:
-                print(f"Audio stream error: {e}")
-                break
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: hand each captured chunk to the send loop."""
+        self.audio_queue.put(in_data)
+        return (None, pyaudio.paContinue)
 
     def _on_partial_transcript(self, event):
         """Handle partial transcript events for wake word detection."""
@@ -190,7 +188,7 @@ class Transcriber:
 
     def run(self):
         """Start threads and async loop."""
-        threading.Thread(target=self._stream_audio).start()
+        self.stream.start_stream()
         print("Connecting to ElevenLabs STT...")
         # threading.Thread(target=lambda: asyncio.run(self.run_async()), daemon=True).start()
         asyncio.run(self.run_async())
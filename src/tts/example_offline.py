@@ -10,7 +10,7 @@ Prerequisites:
 - ALSA audio system configured (aplay command)
 """
 
-from tts.speak import speak, speak_async
+from tts.speak import speak, speak_async, speak_many
 import time
 
 
@@ -51,10 +51,8 @@ def example_multiple_phrases():
         "Third phrase."
     ]
     
-    for i, phrase in enumerate(phrases, 1):
-        print(f"Speaking phrase {i}: {phrase}")
-        speak(phrase)
-        time.sleep(0.5)  # Small pause between phrases
+    # Each phrase is synthesized while the previous one is still playing
+    speak_many(phrases)
     
     print("All phrases spoken!\n")
 
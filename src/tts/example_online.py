@@ -16,11 +16,11 @@ import time
 
 # Handle both direct execution and module import
 try:
-    from .google_tts import GoogleTTS
+    from .google_tts import GoogleTTS, speak
 except ImportError:
     # If relative import fails, try absolute import
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from tts.google_tts import GoogleTTS
+    from tts.google_tts import GoogleTTS, speak
 
 
 # example_asynchronous_tts
@@ -30,6 +30,32 @@ except ImportError:
 
 
 
+def example_prompt_to_speech():
+    """Example of prompt-to-speech with several prompts."""
+    print("Example 4: Prompt-to-Speech")
+    
+    prompts = [
+        "Tell me a short joke about robots.",
+        "Give me one fun fact about space.",
+        "Say a one-sentence motivational quote.",
+    ]
+    try:
+        tts = GoogleTTS(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            model="gemini-2.5-flash-preview-tts",
+            voice_name="Kore"
+        )
+        
+        # One generation request and one TTS request for all three prompts
+        print(f"Speaking answers to {len(prompts)} prompts...")
+        tts.speak_from_prompts(prompts)
+        
+        tts.close()
+        print("Done!\n")
+    except Exception as e:
+        print(f"Error: {e}\n")
+
+
 def example_advanced_usage():
     """Example of advanced usage with custom instance."""
     print("Example 6: Advanced Usage with Custom Instance")
@@ -53,8 +79,8 @@ def example_advanced_usage():
         tts.speak(text)
         
         # Use async methods
-        # thread = tts.speak_async("This is async with custom instance.")
-        # thread.join()
+        # future = tts.speak_async("This is async with custom instance.")
+        # future.result()
         
         # # Prompt-to-speech with custom instance
         # tts.speak_from_prompt("Tell me a fun fact about space.")
@@ -45,7 +45,7 @@ def example_asynchronous_tts():
     try:
         tts = OpenAITTS()
         # Start speaking in background
-        thread = tts.speak_async("This is being spoken asynchronously using OpenAI TTS.")
+        future = tts.speak_async("This is being spoken asynchronously using OpenAI TTS.")
         
         # Do other work while speaking
         print("Program continues while speech is playing...")
@@ -54,7 +54,7 @@ def example_asynchronous_tts():
             time.sleep(0.5)
         
         # Wait for speech to finish
-        thread.join()
+        future.result()
         tts.close()
         print("Speech finished!\n")
     except Exception as e:
@@ -109,12 +109,12 @@ def example_async_prompt_to_speech():
     
     try:
         tts = OpenAITTS()
-        thread = tts.speak_from_prompt_async(
+        future = tts.speak_from_prompt_async(
             "Generate a short story about a robot learning to paint."
         )
         
         print("Waiting for content generation and speech...")
-        thread.join()
+        future.result()
         tts.close()
         print("Done!\n")
     except Exception as e:
@@ -137,8 +137,8 @@ def example_advanced_usage():
         tts.speak("This is using a custom TTS instance.")
         
         # Use async methods
-        thread = tts.speak_async("This is async with custom instance.")
-        thread.join()
+        future = tts.speak_async("This is async with custom instance.")
+        future.result()
         
         # Prompt-to-speech with custom instance
         tts.speak_from_prompt("Tell me a fun fact about space.")
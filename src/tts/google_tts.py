@@ -1,32 +1,52 @@
 
+import asyncio
+import atexit
+import re
+import shutil
 import subprocess
-import tempfile
 import os
-import base64
-import base64
-import os
-# from pydub import AudioSegment
-# import subprocess
-# import tempfile
 import threading
-import io
-import wave
-# import librosa
-# import audioop
-import pyaudio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+from collections import OrderedDict
+import httpx
+try:
+    # SIMD (SSSE3/AVX2/NEON) base64 decoder, drop-in for the stdlib one
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
 from google import genai
 from google.genai import types
 
 
-def wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
-   with wave.open(filename, "wb") as wf:
-      wf.setnchannels(channels)
-      wf.setsampwidth(sample_width)
-      wf.setframerate(rate)
-      wf.writeframes(pcm)
+# Separates the answers when several prompts share one generation request
+_ANSWER_DELIMITER = "---"
+
+# Size of the canonical RIFF/WAV header in front of Gemini PCM
+_WAV_HEADER_BYTES = 44
+
+# Sentence boundary in streamed text: speech for a sentence starts once it is complete
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# How long the TTS worker waits for more speak_async texts to batch together
+_BATCH_WINDOW = 0.05
+# ALSA's list of sound cards, one "index [id]: driver - name" line per card
+_ALSA_CARDS = "/proc/asound/cards"
+
+
+def _extract_inline(response):
+    """Return the audio blob of the first part of a (chunk) response, or None."""
+    try:
+        inline_data = response.candidates[0].content.parts[0].inline_data
+    except (AttributeError, IndexError, TypeError):
+        return None
+    return inline_data if inline_data is not None and inline_data.data else None
+
 
 class GoogleTTS:
-    def __init__(self, api_key=None, model="gemini-2.5-flash-preview-tts", voice_name="Kore"):
+    def __init__(self, api_key=None, model="gemini-2.5-flash-preview-tts", voice_name="Kore",
+                 cache_size=256, cache_dir=None):
         """
         Initialize Google GenAI TTS client.
         
@@ -34,6 +54,8 @@ class GoogleTTS:
             api_key: Google GenAI API key. If None, uses GEMINI_API_KEY env var.
             model: TTS model name (default: "gemini-2.5-flash-preview-tts")
             voice_name: Voice name from available options (default: "Kore")
+            cache_size: Number of utterances kept in memory (default: 256)
+            cache_dir: Optional directory for a persistent PCM cache
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -42,445 +64,266 @@ class GoogleTTS:
                 "or pass api_key parameter."
             )
         
-        self.client = genai.Client(api_key=self.api_key)
+        # One pooled HTTP/2 connection, kept alive between calls so repeated
+        # speak() calls skip the TCP/TLS handshake
+        self.client = genai.Client(
+            api_key=self.api_key,
+            http_options=types.HttpOptions(
+                client_args={
+                    "http2": True,
+                    "limits": httpx.Limits(keepalive_expiry=60),
+                }
+            ),
+        )
+        # Handshake in the background so the first speak() finds a warm connection
+        threading.Thread(target=self._prime_connection, daemon=True).start()
         self.model = model
         self.voice_name = voice_name
+        # Request config is the same for every utterance; build it once
+        self._tts_config = types.GenerateContentConfig(
+            response_modalities=["AUDIO"],
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                        voice_name=voice_name,
+                    )
+                )
+            ),
+        )
+
+        # Synthesized PCM keyed on (text, voice, model): repeated phrases skip
+        # the API round trip. Memory LRU in front of an optional disk cache.
+        self.cache_size = cache_size
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        self._audio_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+        # One worker: async requests queue up and play in order instead of
+        # talking over each other
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        # (text, future) pairs waiting to be spoken in the next batch
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        # asyncio loop for the aio client, started on first use
+        self._loop = None
+        self._loop_lock = threading.Lock()
         
 
         
-        # PyAudio setup for direct streaming
-        self.pyaudio_instance = pyaudio.PyAudio()
+        # Raw PCM format of the TTS responses, played as-is by aplay
         self.sample_rate = 24000
         self.channels = 1
-        self.format = pyaudio.paInt16
-        # Find your USB sound card index
-        self.device_index = self._find_usb_audio_device()
-        if self.device_index is None:
+        # Find your USB sound card
+        self.device = self._find_usb_audio_device()
+        if self.device is None:
             print("Warning: USB audio device not found! Falling back to default.")
-            self.device_index = None  # will use default (often wrong)
 
-        print(f"Using audio output device index: {self.device_index}")
+        print(f"Using audio output device: {self.device or 'default'}")
+
+        # Absolute path, so starting aplay per utterance skips the PATH search
+        self._aplay = shutil.which("aplay") or "aplay"
+
+        # How inline_data is decoded; picked from the first response
+        self._decode = None
     
-    def _synthesize_speech(self, text):
+    def _prime_connection(self):
+        """Open the pooled connection with a cheap request; errors are left to speak()."""
+        try:
+            next(iter(self.client.models.list()), None)
+        except Exception:
+            pass
+
+    def _decode_audio(self, inline_data):
         """
-        Synthesize speech from text using Gemini TTS API.
-        
+        Return the raw PCM bytes of an inline_data part.
+
+        The SDK normally hands back already-decoded bytes ("audio/L16;rate=24000");
+        only str payloads or a ";base64" mime type still need decoding. The
+        choice is made on the first response and reused, so the common path
+        never scans the payload a second time.
+
         Args:
-            text: Text to convert to speech
-            
+            inline_data: Blob from a response part
+
         Returns:
             bytes: Raw PCM audio data
         """
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=text,
-            config=types.GenerateContentConfig(
-                response_modalities=["AUDIO"],
-                speech_config=types.SpeechConfig(
-                    voice_config=types.VoiceConfig(
-                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name=self.voice_name,
-                        )
-                    )
-                ),
-            )
-        )
-        
-        # Extract audio data from response
-        if not response.candidates or not response.candidates[0].content.parts:
-            raise Exception("No audio data in response")
-        
-        inline_data = response.candidates[0].content.parts[0].inline_data
-        if not inline_data or not inline_data.data:
-            raise Exception("No audio data in response parts")
-        
-        # Decode base64 audio data (handle both string and bytes)
-        data = inline_data.data
-        if isinstance(data, str):
-            audio_data = base64.b64decode(data)
-        elif isinstance(data, bytes):
-            # Try to decode if it looks like base64, otherwise use as-is
-            try:
-                audio_data = base64.b64decode(data)
-            except Exception:
-                audio_data = data
-        else:
-            raise Exception(f"Unexpected audio data type: {type(data)}")
-        
-        return audio_data
+        if self._decode is None:
+            data = inline_data.data
+            if isinstance(data, str) or "base64" in (inline_data.mime_type or ""):
+                self._decode = lambda payload: b64decode(payload, validate=False)
+            elif isinstance(data, (bytes, bytearray)):
+                self._decode = lambda payload: payload
+            else:
+                raise Exception(f"Unexpected audio data type: {type(data)}")
+        return self._decode(inline_data.data)
     
-    def _play_audio_stream(self, audio_data):
-        """
-        Play audio data handling both RAW PCM and WAV containers.
-        """
-        try:
-            # Create a virtual file in memory
-            file_stream = io.BytesIO(audio_data)
-            
-            # Try to open it as a WAV file to read the headers
-            try:
-                wf = wave.open(file_stream, 'rb')
-                # If successful, read parameters from the file header
-                channels = wf.getnchannels()
-                rate = wf.getframerate()
-                width = wf.getsampwidth()
-                
-                # Map wave width to pyaudio format
-                pa_format = self.pyaudio_instance.get_format_from_width(width)
-                
-                # Read the actual audio frames (removing the header)
-                chunk_data = wf.readframes(wf.getnframes())
-                wf.close()
-                
-                print(f"DEBUG: Detected WAV. Rate: {rate}, Channels: {channels}, Width: {width}")
-
-            except wave.Error:
-                # If it fails, fall back to your hardcoded raw settings
-                print("DEBUG: Could not parse WAV header. Playing as Raw PCM.")
-                channels = self.channels
-                rate = self.sample_rate
-                pa_format = self.format
-                chunk_data = audio_data
-
-            # Open stream with the CORRECT parameters found above
-            stream = self.pyaudio_instance.open(
-                format=pa_format,
-                channels=channels,
-                rate=rate,
-                output=True
-            )
-            
-            try:
-                stream.write(chunk_data)
-            finally:
-                stream.stop_stream()
-                stream.close()
-                
-        except Exception as e:
-            raise Exception(f"Audio playback error: {e}")
-    
-    def _play_audio_stream_old(self, audio_data):
-        """
-        Play audio data directly from memory stream.
-        
-        Args:
-            audio_data: Raw PCM audio bytes to play
-            
-        Raises:
-            Exception: If audio playback fails
-        """
-        try:
-            stream = self.pyaudio_instance.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                output=True,
-            )
-            
-            try:
-                stream.write(audio_data)
-            finally:
-                stream.stop_stream()
-                stream.close()
-        except Exception as e:
-            raise Exception(f"Audio playback error: {e}")
-    
-    def speak_old(self, text):
-        """
-        Synthesize and play text synchronously.
-        
-        Args:
-            text: Text to speak
-            
-        Raises:
-            Exception: If TTS synthesis or playback fails
-        """
-        try:
-            audio_data = self._synthesize_speech(text)
-            self._play_audio_stream(audio_data)
-        except Exception as e:
-            raise Exception(f"TTS error: {e}")
-    
-    # def speak(self, text):
-    #     """
-    #     Synthesize speech and play using native ALSA 'aplay'.
-    #     """
-    #     try:
-    #         # 1. Generate Content
-    #         response = self.client.models.generate_content(
-    #             model=self.model,
-    #             contents=text,
-    #             config=types.GenerateContentConfig(
-    #                 response_modalities=["AUDIO"],
-    #                 speech_config=types.SpeechConfig(
-    #                     voice_config=types.VoiceConfig(
-    #                         prebuilt_voice_config=types.PrebuiltVoiceConfig(
-    #                             voice_name=self.voice_name,
-    #                         )
-    #                     )
-    #                 ),
-    #             )
-    #         )
-            
-    #         if not response.candidates or not response.candidates[0].content.parts:
-    #             print("Error: No content returned")
-    #             return
-
-    #         inline_data = response.candidates[0].content.parts[0].inline_data
-    #         audio_bytes = base64.b64decode(inline_data.data)
-
-    #         # 2. Save to temp WAV file
-    #         # aplay requires a file path to read headers correctly
-    #         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-    #             f.write(audio_bytes)
-    #             temp_filename = f.name
-
-    #         # 3. Play with aplay
-    #         # -q: Quiet mode (suppress text output)
-    #         # This call blocks until audio finishes. Use speak_async for non-blocking.
-    #         subprocess.run(["aplay", "-q", temp_filename])
-            
-    #         # 4. Cleanup
-    #         os.remove(temp_filename)
-
-    
-        # except Exception as e:
-        #     print(f"TTS Error: {e}")
     def speak(self, text):
         """
         Speak using aplay (works on 99.9% of Raspberry Pi USB speakers)
+
+        Audio is streamed: each chunk is written to aplay as it arrives, so
+        playback starts after the first chunk rather than the whole utterance.
         """
+        player = None
         try:
-            # 1. Generate 24kHz raw PCM from Gemini
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=self.voice_name,
-                            )
-                        )
-                    ),
-                )
-            )
-            
-            # audio_data = base64.b64decode(
-            #     response.candidates[0].content.parts[0].inline_data.data
-            # )
-            data = response.candidates[0].content.parts[0].inline_data.data
-
-            file_name='out.wav'
-            wave_file(file_name, data)
-            # 2. Write to temporary raw file
-            # with tempfile.NamedTemporaryFile(suffix=".raw", delete=False) as f:
-            #     f.write(audio_data)
-            #     temp_path = f.name
-
-            # 3. Play with aplay — this works on ALL USB speakers
-            try:
-                subprocess.run(["aplay", "-q", file_name], check=True)
-                    # subprocess.run([
-                    #     "aplay",
-                    #     "-q",           # quiet
-                    #     "-t", "raw",    # raw PCM
-                    #     "-f", "S16_LE", # 16-bit little-endian
-                    #     "-r", "24000",  # 24kHz
-                    #     "-c", "1",      # mono
-                    #     temp_path
-                    # ], check=True)
-
-                    
-                print(f"Spoke: {text}")
-            finally:
-                pass
-                # os.unlink(temp_path)  # delete temp file
+            cached = self._cached_audio(text)
+            if cached is not None:
+                player = self._open_player()
+                player.stdin.write(cached)
+                player.stdin.close()
+                if player.wait() != 0:
+                    raise subprocess.CalledProcessError(player.returncode, "aplay")
+                print(f"Spoke (cached): {text}")
+                return
 
-        except Exception as e:
-            print(f"TTS Error: {e}")
-    def speak222(self, text):
-        try:
-            response = self.client.models.generate_content(
+            # 1. Stream 24kHz raw PCM from Gemini
+            stream = self.client.models.generate_content_stream(
                 model=self.model,
                 contents=text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(...),
-                )
-            )
-            
-            print("DEBUG: Response received")
-            raw_pcm = base64.b64decode(response.candidates[0].content.parts[0].inline_data.data)
-
-            # Convert raw 24kHz 16-bit mono PCM → AudioSegment
-            print("DEBUG: Converting raw PCM to AudioSegment")
-            audio = AudioSegment(
-                data=raw_pcm,
-                sample_width=2,
-                frame_rate=24000,
-                channels=1
+                config=self._tts_config,
             )
 
-            # Resample to 48kHz and export as raw again
-            print("DEBUG: Resampling to 48kHz")
-            audio_48k = audio.set_frame_rate(48000)
-            raw_48k = audio_48k.raw_data
-
-            print("DEBUG: Opening PyAudio stream")
-            stream = self.pyaudio_instance.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=48000,
-                output=True,
-                output_device_index=self.device_index
-            )
-            print("DEBUG: Writing PCM data to stream")
-            stream.write(raw_48k)
-            print("DEBUG: Stopping stream")
-            stream.stop_stream()
-            print("DEBUG: Closing stream")
-            stream.close()
+            # 2. Pipe each chunk straight into aplay — this works on ALL USB
+            # speakers, and skips writing/reading a WAV file on the SD card
+            first = True
+            chunks = []
+            for chunk in stream:
+                inline_data = _extract_inline(chunk)
+                if inline_data is None:
+                    continue
+                pcm = self._decode_audio(inline_data)
+                if first:
+                    # Only the first chunk can carry a WAV header
+                    if pcm[:4] == b"RIFF":
+                        pcm = memoryview(pcm)[_WAV_HEADER_BYTES:]
+                    player = self._open_player()
+                    first = False
+                player.stdin.write(pcm)
+                player.stdin.flush()
+                chunks.append(pcm)
+
+            if player is None:
+                raise Exception("No audio data in response")
+            player.stdin.close()
+            if player.wait() != 0:
+                raise subprocess.CalledProcessError(player.returncode, "aplay")
+            print(f"Spoke: {text}")
 
         except Exception as e:
+            if player is not None and player.poll() is None:
+                player.kill()
             print(f"TTS Error: {e}")
-    def speak22(self, text):
-        """
-        Synthesize speech and stream raw PCM to PyAudio.
-        """
-        try:
-            # 1. Generate Audio
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=text,
-                config=types.GenerateContentConfig(
-                    response_modalities=["AUDIO"],
-                    speech_config=types.SpeechConfig(
-                        voice_config=types.VoiceConfig(
-                            prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                voice_name=self.voice_name,
-                            )
-                        )
-                    ),
-                )
-            )
-            
-            if not response.candidates or not response.candidates[0].content.parts:
-                print("Error: No content returned")
-                return
+            return
 
-            inline_data = response.candidates[0].content.parts[0].inline_data
-            audio_bytes = base64.b64decode(inline_data.data)
-
-            # 2. STRIP THE HEADER (The Fix)
-            # Gemini sends a WAV file (Linear16 + Header).
-            # The header is standard 44 bytes.
-            # If we play the header, we hear "TSK". If we skip it, we hear audio.
-            # if audio_bytes.startswith(b'RIFF'):
-            #     # Skip the first 44 bytes (WAV Header)
-            #     pcm_data = audio_bytes[44:]
-            # else:
-            #     # If no header (rare), play as is
-            #     pcm_data = audio_bytes
-
-            # # 3. Stream to PyAudio
-            # stream = self.pyaudio_instance.open(
-            #     format=self.format,
-            #     channels=self.channels,
-            #     rate=self.sample_rate,
-            #     output=True
-            # )
-
-            # print("DEBUG: Streaming audio to PyAudio")
-            # with io.BytesIO(audio_bytes) as wav_io:
-            #     with wave.open(wav_io, 'rb') as wf:
-            #         pcm_data = wf.readframes(wf.getnframes())   # this is pure PCM
-
-            # print("DEBUG: Opening PyAudio stream")
-            # stream = self.pyaudio_instance.open(
-            #     format=self.pyaudio_instance.get_format_from_width(wf.getsampwidth()),
-            #     channels=wf.getnchannels(),
-            #     rate=wf.getframerate(),
-            #     output=True,
-            # )
-            
-            # print("DEBUG: Writing PCM data to stream")
-            # stream.write(pcm_data)
-            # print("DEBUG: Stopping stream")
-            # stream.stop_stream()
-            # print("DEBUG: Closing stream")
-            # stream.close()
-
-
-            
+        # Caching happens after playback so a cache failure can't cut it short
+        try:
+            self._store_audio(text, b"".join(chunks))
+        except Exception as e:
+            print(f"Warning: could not cache TTS audio: {e}")
 
+    def _cache_key(self, text):
+        """Hash the text together with the voice and model that render it."""
+        return hashlib.sha1(f"{text}|{self.voice_name}|{self.model}".encode()).hexdigest()
 
-            # inline_data = response.candidates[0].content.parts[0].inline_data
-            # audio_bytes = base64.b64decode(inline_data.data)
-
-            # # Gemini TTS returns raw 24kHz, 16-bit, mono PCM (little-endian)
-            # # No WAV header → treat as raw PCM directly
-            # print("DEBUG: Opening PyAudio stream")
-            # stream = self.pyaudio_instance.open(
-            #     format=pyaudio.paInt16,        # 16-bit
-            #     channels=1,                    # mono
-            #     rate=24000,                    # fixed sample rate
-            #     output=True,
-            #     output_device_index=self.device_index
-            # )
-
-            #==
-            inline_data = response.candidates[0].content.parts[0].inline_data
-            audio_24khz = base64.b64decode(inline_data.data)  # 24kHz, 16-bit, mono
-
-            # 2. RESAMPLE from 24kHz → 48kHz (most USB devices support this)
-            audio_48khz = audioop.ratecv(
-                audio_24khz, 
-                2,              # sample width (2 bytes = 16-bit)
-                1,              # mono
-                24000,          # source rate
-                48000,          # target rate
-                None            # no state
-            )[0]
-
-            # 3. Play at 48kHz (almost all USB devices support this)
-            stream = self.pyaudio_instance.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=48000,                    # ← now 48kHz
-                output=True,
-                output_device_index=self.device_index
-            )
+    def _cached_audio(self, text):
+        """
+        Look up previously synthesized PCM for `text`.
 
-            print("DEBUG: Writing PCM data to stream")
-            stream.write(audio_48khz)   # direct raw PCM write
+        Args:
+            text: Text that was spoken
 
-            print("DEBUG: Stopping stream")
-            stream.stop_stream()
-            print("DEBUG: Closing stream")
-            stream.close()
+        Returns:
+            bytes: Raw PCM audio data, or None on a cache miss
+        """
+        key = self._cache_key(text)
+        with self._cache_lock:
+            pcm = self._audio_cache.get(key)
+            if pcm is not None:
+                self._audio_cache.move_to_end(key)
+                return pcm
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, key + ".pcm"), "rb") as f:
+                pcm = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, pcm)
+        return pcm
+
+    def _store_audio(self, text, pcm):
+        """Add synthesized PCM to the memory cache and, if enabled, the disk cache."""
+        key = self._cache_key(text)
+        self._remember(key, pcm)
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, key + ".pcm")
+            # Write then rename so a concurrent reader never sees half a file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(pcm)
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _remember(self, key, pcm):
+        with self._cache_lock:
+            self._audio_cache[key] = pcm
+            self._audio_cache.move_to_end(key)
+            while len(self._audio_cache) > self.cache_size:
+                self._audio_cache.popitem(last=False)
+
+    def _open_player(self):
+        """Start aplay reading raw 24kHz 16-bit mono PCM from its stdin."""
+        cmd = [
+            self._aplay,
+            "-q",                        # quiet
+            "-t", "raw",                 # raw PCM, no header to parse
+            "-f", "S16_LE",              # 16-bit little-endian
+            "-r", str(self.sample_rate), # 24kHz
+            "-c", str(self.channels),    # mono
+        ]
+        if self.device:
+            cmd += ["-D", self.device]
+        return subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            # Skip closing every inherited fd (HTTP sockets) in the child
+            close_fds=False,
+        )
 
-        except Exception as e:
-            print(f"TTS Error: {e}")
+    @staticmethod
+    def _find_usb_audio_device():
+        """
+        Auto-detect USB sound card (skip HDMI and built-in analog)
 
-    def _find_usb_audio_device(self):
-        """Auto-detect USB sound card (skip HDMI and built-in analog)"""
-        info = self.pyaudio_instance.get_host_api_info_by_index(0)
-        num_devices = info.get('deviceCount')
-
-        for i in range(num_devices):
-            device = self.pyaudio_instance.get_device_info_by_index(i)
-            if (device['maxOutputChannels'] > 0 and 
-                'USB' in device['name'] and 
-                'bcm2835' not in device['name'].lower()):  # skip built-in
-                print(f"Found USB audio device: {device['name']} (index {i})")
-                return i
+        Returns the ALSA device name for aplay, e.g. "plughw:1,0", or None.
+        plughw converts the 24kHz stream to a rate the card supports.
+        """
+        try:
+            with open(_ALSA_CARDS) as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        for line in lines:
+            # " 1 [Device         ]: USB-Audio - USB Audio Device"
+            match = re.match(r"\s*(\d+) \[.*\]: (.*)", line)
+            if match and "USB" in match.group(2) and "bcm2835" not in match.group(2).lower():
+                print(f"Found USB audio device: {match.group(2).strip()} (card {match.group(1)})")
+                return f"plughw:{match.group(1)},0"
         return None
 
     def speak_from_prompt(self, prompt, generation_model="gemini-2.0-flash"):
         """
         Generate content from a prompt using Gemini, then convert to speech.
+
+        The generated text is streamed and each sentence is spoken as soon as
+        it is complete, so speech starts before generation has finished.
         
         Args:
             prompt: Prompt to generate content from
@@ -490,42 +333,117 @@ class GoogleTTS:
             Exception: If generation or TTS fails
         """
         try:
-            # First, generate text content from prompt
+            self.speak_from_prompt_async(prompt, generation_model).result()
+        except Exception as e:
+            raise Exception(f"Prompt-to-speech error: {e}")
+
+    async def _speak_from_prompt_stream(self, prompt, generation_model):
+        """
+        Stream generated text and queue each finished sentence for speech.
+
+        Sentences go to the TTS worker in order while the rest of the text is
+        still being generated; returns once all of them have been spoken.
+        """
+        spoken = []
+        buffer = ""
+        stream = await self.client.aio.models.generate_content_stream(
+            model=generation_model,
+            contents=prompt,
+        )
+        async for chunk in stream:
+            buffer += chunk.text or ""
+            *sentences, buffer = _SENTENCE_END.split(buffer)
+            for sentence in sentences:
+                spoken.append(self._executor.submit(self.speak, sentence))
+        if buffer.strip():
+            spoken.append(self._executor.submit(self.speak, buffer.strip()))
+        if not spoken:
+            raise Exception("No text generated from prompt")
+        for future in spoken:
+            await asyncio.wrap_future(future)
+
+    def _event_loop(self):
+        """Return the background asyncio loop used by the aio client, starting it if needed."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="tts-aio",
+                                 daemon=True).start()
+        return self._loop
+    
+    def speak_from_prompts(self, prompts, generation_model="gemini-2.0-flash"):
+        """
+        Generate content for several prompts, then speak all of it.
+        
+        All prompts are answered in one generation request and the answers are
+        spoken with one TTS request, so N prompts cost two round-trips
+        instead of 2N.
+        
+        Args:
+            prompts: List of prompts to generate content from
+            generation_model: Model to use for text generation (default: "gemini-2.0-flash")
+            
+        Raises:
+            Exception: If generation or TTS fails
+        """
+        try:
+            numbered = "\n".join(f"{i}. {p}" for i, p in enumerate(prompts, 1))
             text_response = self.client.models.generate_content(
                 model=generation_model,
-                contents=prompt,
+                contents=(
+                    "Answer each of the following prompts in order. Separate the "
+                    f"answers with a line containing only {_ANSWER_DELIMITER}\n\n{numbered}"
+                ),
             )
             
             generated_text = text_response.text
             if not generated_text:
-                raise Exception("No text generated from prompt")
+                raise Exception("No text generated from prompts")
             
-            # Then convert generated text to speech
-            self.speak(generated_text)
+            answers = [a.strip() for a in generated_text.split(_ANSWER_DELIMITER)]
+            # Blank lines between answers give a natural pause in the speech
+            self.speak("\n\n".join(a for a in answers if a))
         except Exception as e:
             raise Exception(f"Prompt-to-speech error: {e}")
     
-    def _speak_worker(self, text):
-        """Worker function for async speaking."""
-        self.speak(text)
-    
-    def _speak_from_prompt_worker(self, prompt, generation_model):
-        """Worker function for async prompt-to-speech."""
-        self.speak_from_prompt(prompt, generation_model)
+    def _speak_worker(self):
+        """Worker function for async speaking: speak everything queued as one request."""
+        if not self._pending:
+            return  # already spoken by an earlier batch
+        # Give texts that arrive in a burst the chance to share one request
+        time.sleep(_BATCH_WINDOW)
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            self.speak(_join_sentences(text for text, _ in batch))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for _, future in batch:
+                future.set_result(None)
     
     def speak_async(self, text):
         """
         Synthesize and play text asynchronously.
+
+        Texts queued within a short window of each other are spoken together
+        in a single request.
         
         Args:
             text: Text to speak
             
         Returns:
-            Thread object
+            Future that completes when the text has been spoken
         """
-        thread = threading.Thread(target=self._speak_worker, args=(text,))
-        thread.start()
-        return thread
+        future = Future()
+        with self._pending_lock:
+            self._pending.append((text, future))
+        self._executor.submit(self._speak_worker)
+        return future
     
     def speak_from_prompt_async(self, prompt, generation_model="gemini-2.0-flash"):
         """
@@ -536,16 +454,124 @@ class GoogleTTS:
             generation_model: Model to use for text generation (default: "gemini-2.0-flash")
             
         Returns:
-            Thread object
+            Future that completes when the content has been spoken
         """
-        thread = threading.Thread(
-            target=self._speak_from_prompt_worker,
-            args=(prompt, generation_model)
+        return asyncio.run_coroutine_threadsafe(
+            self._speak_from_prompt_stream(prompt, generation_model), self._event_loop()
         )
-        thread.start()
-        return thread
     
     def close(self):
-        """Clean up PyAudio resources."""
-        if self.pyaudio_instance:
-            self.pyaudio_instance.terminate()
+        """Stop the speech worker and the prompt event loop."""
+        self._executor.shutdown(wait=False)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def _join_sentences(texts):
+    """Join texts with sentence breaks so the batch is read with natural pauses."""
+    parts = []
+    for text in texts:
+        text = text.strip()
+        if text:
+            parts.append(text if text[-1] in ".!?" else text + ".")
+    return " ".join(parts)
+
+
+# Convenience functions for backward compatibility: one shared instance per
+# (api key, model, voice), so each configuration keeps its warm connection
+_tts_instances = {}
+_tts_instances_lock = threading.Lock()
+
+
+def _close_tts_instances():
+    for tts in _tts_instances.values():
+        tts.close()
+
+
+atexit.register(_close_tts_instances)
+
+
+def get_tts_instance(api_key=None, model="gemini-2.5-flash-preview-tts", voice_name="Kore"):
+    """Get or create the shared TTS instance for this api key, model and voice."""
+    key = (api_key or os.getenv("GEMINI_API_KEY"), model, voice_name)
+    with _tts_instances_lock:
+        tts = _tts_instances.get(key)
+        if tts is None:
+            tts = _tts_instances[key] = GoogleTTS(api_key, model, voice_name)
+    return tts
+
+
+def speak(text, api_key=None, model="gemini-2.5-flash-preview-tts", voice_name="Kore"):
+    """
+    Convenience function to speak text using Google GenAI TTS.
+    
+    Args:
+        text: Text to speak
+        api_key: Google GenAI API key (optional, uses GEMINI_API_KEY env var if not provided)
+        model: TTS model name (default: "gemini-2.5-flash-preview-tts")
+        voice_name: Voice name (default: "Kore")
+    """
+    tts = get_tts_instance(api_key, model, voice_name)
+    tts.speak(text)
+
+
+def speak_async(text, api_key=None, model="gemini-2.5-flash-preview-tts", voice_name="Kore"):
+    """
+    Convenience function to speak text asynchronously using Google GenAI TTS.
+    
+    Args:
+        text: Text to speak
+        api_key: Google GenAI API key (optional, uses GEMINI_API_KEY env var if not provided)
+        model: TTS model name (default: "gemini-2.5-flash-preview-tts")
+        voice_name: Voice name (default: "Kore")
+        
+    Returns:
+        Future that completes when the text has been spoken
+    """
+    tts = get_tts_instance(api_key, model, voice_name)
+    return tts.speak_async(text)
+
+
+def speak_from_prompt(
+    prompt,
+    api_key=None,
+    model="gemini-2.5-flash-preview-tts",
+    voice_name="Kore",
+    generation_model="gemini-2.0-flash"
+):
+    """
+    Generate content from prompt and speak it using Google GenAI TTS.
+    
+    Args:
+        prompt: Prompt to generate content from
+        api_key: Google GenAI API key (optional, uses GEMINI_API_KEY env var if not provided)
+        model: TTS model name (default: "gemini-2.5-flash-preview-tts")
+        voice_name: Voice name (default: "Kore")
+        generation_model: Model to use for text generation (default: "gemini-2.0-flash")
+    """
+    tts = get_tts_instance(api_key, model, voice_name)
+    tts.speak_from_prompt(prompt, generation_model)
+
+
+def speak_from_prompt_async(
+    prompt,
+    api_key=None,
+    model="gemini-2.5-flash-preview-tts",
+    voice_name="Kore",
+    generation_model="gemini-2.0-flash"
+):
+    """
+    Generate content from prompt and speak it asynchronously using Google GenAI TTS.
+    
+    Args:
+        prompt: Prompt to generate content from
+        api_key: Google GenAI API key (optional, uses GEMINI_API_KEY env var if not provided)
+        model: TTS model name (default: "gemini-2.5-flash-preview-tts")
+        voice_name: Voice name (default: "Kore")
+        generation_model: Model to use for text generation (default: "gemini-2.0-flash")
+        
+    Returns:
+        Future that completes when the content has been spoken
+    """
+    tts = get_tts_instance(api_key, model, voice_name)
+    return tts.speak_from_prompt_async(prompt, generation_model)
@@ -1,12 +1,167 @@
+import atexit
+import hashlib
+import io
 import os
+import queue
+import re
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 import pyaudio
 from openai import OpenAI
+try:
+    # Optional: decodes compressed (Opus/MP3) responses for slow links
+    import av
+except ImportError:
+    av = None
+
+# Bytes per network read / stream write of 24kHz 16-bit PCM (~85 ms)
+_CHUNK_BYTES = 4096
+
+# PortAudio callback period in frames
+_FRAMES_PER_BUFFER = 1024
+
+# A complete sentence in streamed LLM output: up to terminal punctuation
+# (plus closing quotes/brackets) followed by whitespace
+_SENTENCE = re.compile(r'.+?[.!?]+[)"\']*\s+', re.S)
+
+# Synthesized PCM is kept here between runs, oldest-used files evicted first
+_DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "carlab", "tts")
+
+# PCM buffered between the network reader and the PortAudio callback (~1.4 s)
+_RING_BYTES = 64 * 1024
+# Poll interval while the writer waits for room or for playback to drain
+_RING_WAIT = 0.005
+# Extra time allowed beyond the audio's own duration before playback counts as stalled
+_RING_SLACK = 2.0
+
+
+class _PcmRing:
+    """
+    Single-producer/single-consumer byte ring feeding the audio callback.
+
+    The writer only advances `_tail` and the PortAudio callback only advances
+    `_head`, so neither side takes a lock; the callback never blocks.
+    """
+
+    def __init__(self, capacity, frame_bytes, bytes_per_second):
+        self.capacity = capacity
+        self.frame_bytes = frame_bytes
+        self.bytes_per_second = bytes_per_second
+        self._view = memoryview(bytearray(capacity))
+        self._head = 0  # total bytes consumed
+        self._tail = 0  # total bytes produced
+
+    def _deadline(self, pending):
+        """Latest time by which `pending` more bytes should have been played."""
+        return time.monotonic() + pending / self.bytes_per_second + _RING_SLACK
+
+    def _wait(self, is_active, deadline):
+        """Sleep one poll interval, raising if the callback can no longer catch up."""
+        if not is_active():
+            raise RuntimeError("Audio output stream stopped")
+        if time.monotonic() > deadline:
+            raise RuntimeError("Audio output stalled")
+        time.sleep(_RING_WAIT)
+
+    def write(self, data, is_active):
+        """Copy `data` into the ring, waiting while it is full."""
+        data = memoryview(data).cast("B")
+        deadline = self._deadline(self._tail - self._head + len(data))
+        while len(data):
+            free = self.capacity - (self._tail - self._head)
+            if not free:
+                self._wait(is_active, deadline)
+                continue
+            n = min(free, len(data))
+            start = self._tail % self.capacity
+            first = min(n, self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            self._view[:n - first] = data[first:n]
+            self._tail += n
+            data = data[n:]
+
+    def read(self, size):
+        """Take up to `size` bytes, padded with silence if the ring runs dry."""
+        n = min(size, self._tail - self._head)
+        n -= n % self.frame_bytes  # never split a sample
+        start = self._head % self.capacity
+        first = min(n, self.capacity - start)
+        if first == size:
+            # Common case: one contiguous run, copied once
+            out = bytes(self._view[start:start + first])
+        else:
+            # Wrapped or short: assemble in one zeroed (silent) buffer
+            # instead of concatenating bytes objects
+            buf = bytearray(size)
+            buf[:first] = self._view[start:start + first]
+            buf[first:n] = self._view[:n - first]
+            out = bytes(buf)  # PyAudio wants a read-only buffer back
+        self._head += n
+        return out
+
+    def drain(self, is_active):
+        """Wait until the callback has consumed everything written."""
+        deadline = self._deadline(self._tail - self._head)
+        while self._tail - self._head >= self.frame_bytes:
+            self._wait(is_active, deadline)
+
+    def clear(self):
+        """Drop unplayed audio; only safe while no callback is running."""
+        self._head = self._tail
+
+
+def _frame_blocks(chunks, block_bytes, frame_bytes):
+    """
+    Regroup arbitrary byte chunks into fixed-size blocks of whole frames.
+    
+    Decoded audio arrives in uneven pieces; fixed blocks keep the number of
+    ring writes low and every write frame-aligned. The final partial block is
+    zero-padded to a frame boundary.
+    """
+    acc = bytearray()
+    for chunk in chunks:
+        if not acc and len(chunk) == block_bytes:
+            yield chunk  # already a full block: pass through without copying
+            continue
+        acc += chunk
+        while len(acc) >= block_bytes:
+            yield bytes(acc[:block_bytes])
+            del acc[:block_bytes]
+    if acc:
+        acc += bytes(-len(acc) % frame_bytes)
+        yield bytes(acc)
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks, for PyAV to demux."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
 
 
 class OpenAITTS:
-    def __init__(self, api_key=None, model="gpt-4o-mini-tts", voice="alloy"):
+    def __init__(self, api_key=None, model="gpt-4o-mini-tts", voice="alloy",
+                 cache_dir=_DEFAULT_CACHE_DIR, cache_max_bytes=100 * 1024 * 1024,
+                 memory_cache_size=32, network_codec="pcm"):
         """
         Initialize OpenAI TTS client.
         
@@ -14,6 +169,12 @@ class OpenAITTS:
             api_key: OpenAI API key. If None, uses OPENAI_API_KEY env var.
             model: TTS model name (default: "gpt-4o-mini-tts")
             voice: Voice name from available options (default: "alloy")
+            cache_dir: Directory for cached PCM, or None to disable the disk cache
+                (default: "~/.cache/carlab/tts")
+            cache_max_bytes: Disk cache budget before old clips are evicted (default: 100 MB)
+            memory_cache_size: Number of recent clips also kept in memory (default: 32)
+            network_codec: Audio format requested from the API: "pcm", or "opus"/"mp3"
+                to cut download size on slow links (decoded locally, needs PyAV)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -22,7 +183,18 @@ class OpenAITTS:
                 "or pass api_key parameter."
             )
         
-        self.client = OpenAI(api_key=self.api_key)
+        # HTTP/2 with long-lived keep-alive: later requests reuse one warm connection.
+        # No retries and tight timeouts: a slow request fails fast instead of
+        # stalling speech behind retry backoff.
+        self.client = OpenAI(
+            api_key=self.api_key,
+            max_retries=0,
+            timeout=httpx.Timeout(connect=2.0, read=30.0, write=5.0, pool=2.0),
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300),
+            ),
+        )
         self.model = model
         self.voice = voice
         
@@ -31,60 +203,229 @@ class OpenAITTS:
         self.sample_rate = 24000
         self.channels = 1
         self.format = pyaudio.paInt16
-    
-    def _synthesize_speech(self, text):
+        # Output stream opened on first use and kept for later utterances;
+        # the lock lets one utterance at a time write to it
+        self._out_stream = None
+        self._out_lock = threading.Lock()
+        self._frame_bytes = self.channels * pyaudio.get_sample_size(self.format)
+        self._ring = _PcmRing(
+            _RING_BYTES, self._frame_bytes, self.sample_rate * self._frame_bytes
+        )
+
+        # Repeated text is played from cache instead of re-synthesized
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Warning: disk cache disabled, cannot create {self.cache_dir}: {e}")
+                self.cache_dir = None
+        self.cache_max_bytes = cache_max_bytes
+        # Running size of the disk cache, so a store only rescans when over budget
+        self._cache_bytes = sum(size for _, size, _ in self._cached_clips())
+        self.memory_cache_size = memory_cache_size
+        self._memory_cache = OrderedDict()
+
+        if network_codec != "pcm" and av is None:
+            print(f"Warning: PyAV not installed, requesting pcm instead of {network_codec}.")
+            network_codec = "pcm"
+        self.network_codec = network_codec
+
+        # Async calls queue here and play one after another
+        self._play_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-play")
+
+        # Handshake in the background so the first speak() finds a warm connection
+        threading.Thread(target=self._prewarm, daemon=True).start()
+
+    def _prewarm(self):
+        """Open the pooled connection with a cheap request; errors are left to speak()."""
+        try:
+            self.client.models.list()
+        except Exception:
+            pass
+
+    def _output_stream(self):
         """
-        Synthesize speech from text using OpenAI TTS API.
+        Return the persistent output stream, opening it on first use.
         
-        Args:
-            text: Text to convert to speech
-            
-        Returns:
-            bytes: Raw PCM audio data
+        The stream runs in callback mode: PortAudio's own thread pulls audio
+        from the ring buffer (silence when idle), so playback timing does not
+        depend on when the Python writer gets scheduled.
         """
-        try:
-            response = self.client.audio.speech.create(
-                model=self.model,
-                voice=self.voice,
-                input=text,
-                response_format="pcm",  # Use PCM for direct playback
-                speed=1.0,
+        if self._out_stream is None:
+            self._out_stream = self.pyaudio_instance.open(
+                format=self.format,
+                channels=self.channels,
+                rate=self.sample_rate,
+                output=True,
+                frames_per_buffer=_FRAMES_PER_BUFFER,
+                stream_callback=self._fill_output,
             )
-            
-            # Read audio data from response stream
-            audio_data = b""
-            for chunk in response.iter_bytes():
-                audio_data += chunk
-            
-            return audio_data
-        except Exception as e:
-            raise Exception(f"OpenAI TTS API error: {e}")
+        return self._out_stream
+    
+    def _reset_output(self):
+        """Close the output stream and discard unplayed audio; caller holds the lock."""
+        stream, self._out_stream = self._out_stream, None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception:
+                pass
+        self._ring.clear()
+    
+    def _fill_output(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: hand the next frames from the ring to the device."""
+        return self._ring.read(frame_count * self._frame_bytes), pyaudio.paContinue
     
-    def _play_audio_stream(self, audio_data):
+    def _play(self, stream, pcm):
+        """Queue PCM for the callback and wait until it has been played."""
+        self._ring.write(pcm, stream.is_active)
+        self._ring.drain(stream.is_active)
+        # The last callback's buffer is still in the device
+        time.sleep(stream.get_output_latency())
+    
+    def _stream_speech(self, text):
         """
-        Play audio data directly from memory stream.
+        Synthesize speech with the OpenAI TTS API and play it as it arrives.
+        
+        Each chunk is written to the output stream as soon as it is received,
+        so playback starts with the first chunk instead of the full response.
         
         Args:
-            audio_data: Raw PCM audio bytes to play
+            text: Text to convert to speech
             
         Raises:
-            Exception: If audio playback fails
+            Exception: If synthesis or audio playback fails
         """
+        key = hashlib.blake2b(
+            f"{self.model}|{self.voice}|{text}".encode(), digest_size=16
+        ).hexdigest()
+        path = os.path.join(self.cache_dir, key + ".pcm") if self.cache_dir else None
+
+        with self._out_lock:
+            try:
+                stream = self._output_stream()
+
+                pcm = self._memory_cache.get(key)
+                if pcm is None and path and os.path.exists(path):
+                    os.utime(path)  # mark as recently used for eviction
+                    with open(path, "rb") as f:
+                        pcm = f.read()
+                if pcm is not None:
+                    self._remember(key, pcm)
+                    self._play(stream, pcm)
+                    return
+
+                chunks = []
+                with self.client.audio.speech.with_streaming_response.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=text,
+                    response_format=self.network_codec,
+                    speed=1.0,
+                ) as response:
+                    blocks = _frame_blocks(
+                        self._pcm_chunks(response), _CHUNK_BYTES, self._frame_bytes
+                    )
+                    for chunk in blocks:
+                        self._ring.write(chunk, stream.is_active)
+                        chunks.append(chunk)
+                self._play(stream, b"")
+                pcm = b"".join(chunks)
+                self._remember(key, pcm)
+            except Exception:
+                # Leave no stalled stream or stale audio for the next utterance
+                self._reset_output()
+                raise
+
+        if path:
+            try:
+                self._store_to_disk(path, pcm)
+            except Exception as e:
+                print(f"Warning: could not cache TTS audio: {e}")
+    
+    def _pcm_chunks(self, response):
+        """
+        Yield the response as 16-bit PCM at the stream's rate, chunk by chunk.
+        
+        PCM responses pass straight through; compressed ones are decoded as
+        they download, so playback still starts with the first packets.
+        """
+        if self.network_codec == "pcm":
+            # Even chunk size keeps every write on a 16-bit sample boundary
+            yield from response.iter_bytes(chunk_size=_CHUNK_BYTES)
+            return
+
+        reader = _ChunkReader(response.iter_bytes(chunk_size=_CHUNK_BYTES))
+        container_format = "ogg" if self.network_codec == "opus" else self.network_codec
+        resampler = av.AudioResampler(
+            format="s16",
+            layout="mono" if self.channels == 1 else "stereo",
+            rate=self.sample_rate,
+        )
+        with av.open(reader, format=container_format) as container:
+            for frame in container.decode(audio=0):
+                for out in resampler.resample(frame):
+                    yield out.to_ndarray().tobytes()
+        for out in resampler.resample(None):  # flush
+            yield out.to_ndarray().tobytes()
+    
+    def _remember(self, key, pcm):
+        """Keep a clip in the in-memory LRU, dropping the least recently used."""
+        self._memory_cache[key] = pcm
+        self._memory_cache.move_to_end(key)
+        while len(self._memory_cache) > self.memory_cache_size:
+            self._memory_cache.popitem(last=False)
+    
+    def _cached_clips(self):
+        """Return (mtime, size, path) for every clip in the disk cache."""
+        clips = []
+        if not self.cache_dir:
+            return clips
         try:
-            stream = self.pyaudio_instance.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                output=True,
-            )
-            
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return clips
+        for entry in entries:
+            if entry.name.endswith(".pcm"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another process meanwhile
+                clips.append((st.st_mtime, st.st_size, entry.path))
+        return clips
+    
+    def _store_to_disk(self, path, pcm):
+        """Write a clip to the disk cache, then evict old clips over the byte budget."""
+        # Write then rename so a reader never sees a partial clip
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp_path, path)
+        except OSError:
             try:
-                stream.write(audio_data)
-            finally:
-                stream.stop_stream()
-                stream.close()
-        except Exception as e:
-            raise Exception(f"Audio playback error: {e}")
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._cache_bytes += len(pcm)
+        if self._cache_bytes <= self.cache_max_bytes:
+            return
+
+        # Over budget: rescan for the real total and drop the oldest clips
+        clips = sorted(self._cached_clips())
+        total = sum(size for _, size, _ in clips)
+        for _, size, old_path in clips:
+            if total <= self.cache_max_bytes:
+                break
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._cache_bytes = total
     
     def speak(self, text):
         """
@@ -97,8 +438,7 @@ class OpenAITTS:
             Exception: If TTS synthesis or playback fails
         """
         try:
-            audio_data = self._synthesize_speech(text)
-            self._play_audio_stream(audio_data)
+            self._stream_speech(text)
         except Exception as e:
             raise Exception(f"TTS error: {e}")
     
@@ -106,6 +446,9 @@ class OpenAITTS:
         """
         Generate content from a prompt using OpenAI, then convert to speech.
         
+        The completion is streamed and each sentence is spoken as soon as it
+        is complete, so speech starts before generation has finished.
+        
         Args:
             prompt: Prompt to generate content from
             generation_model: Model to use for text generation (default: "gpt-4o-mini")
@@ -114,31 +457,59 @@ class OpenAITTS:
             Exception: If generation or TTS fails
         """
         try:
-            # First, generate text content from prompt
-            response = self.client.chat.completions.create(
-                model=generation_model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
+            # Sentences are spoken on a second thread while the rest of the
+            # completion is still streaming in
+            sentences = queue.Queue()
+            errors = []
+            speaker = threading.Thread(
+                target=self._speak_sentences, args=(sentences, errors), daemon=True
             )
+            speaker.start()
+            generated = False
+            try:
+                response = self.client.chat.completions.create(
+                    model=generation_model,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=500,
+                    stream=True,
+                )
+                
+                buffer = ""
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    buffer += chunk.choices[0].delta.content or ""
+                    pos = 0
+                    while (match := _SENTENCE.match(buffer, pos)):
+                        sentences.put(match.group().strip())
+                        pos = match.end()
+                        generated = True
+                    buffer = buffer[pos:]
+                if buffer.strip():
+                    sentences.put(buffer.strip())
+                    generated = True
+            finally:
+                sentences.put(None)
+                speaker.join()
             
-            generated_text = response.choices[0].message.content
-            if not generated_text:
+            if errors:
+                raise errors[0]
+            if not generated:
                 raise Exception("No text generated from prompt")
-            
-            # Then convert generated text to speech
-            self.speak(generated_text)
         except Exception as e:
             raise Exception(f"Prompt-to-speech error: {e}")
     
-    def _speak_worker(self, text):
-        """Worker function for async speaking."""
-        self.speak(text)
-    
-    def _speak_from_prompt_worker(self, prompt, generation_model):
-        """Worker function for async prompt-to-speech."""
-        self.speak_from_prompt(prompt, generation_model)
+    def _speak_sentences(self, sentences, errors):
+        """Speak sentences from the queue until None; the first error stops speech."""
+        while (sentence := sentences.get()) is not None:
+            if errors:
+                continue  # keep draining so the producer never blocks
+            try:
+                self._stream_speech(sentence)
+            except Exception as e:
+                errors.append(e)
     
     def speak_async(self, text):
         """
@@ -148,11 +519,9 @@ class OpenAITTS:
             text: Text to speak
             
         Returns:
-            Thread object
+            Future that completes when the text has been spoken
         """
-        thread = threading.Thread(target=self._speak_worker, args=(text,))
-        thread.start()
-        return thread
+        return self._play_pool.submit(self.speak, text)
     
     def speak_from_prompt_async(self, prompt, generation_model="gpt-4o-mini"):
         """
@@ -163,31 +532,44 @@ class OpenAITTS:
             generation_model: Model to use for text generation (default: "gpt-4o-mini")
             
         Returns:
-            Thread object
+            Future that completes when the content has been spoken
         """
-        thread = threading.Thread(
-            target=self._speak_from_prompt_worker,
-            args=(prompt, generation_model)
-        )
-        thread.start()
-        return thread
+        return self._play_pool.submit(self.speak_from_prompt, prompt, generation_model)
     
     def close(self):
         """Clean up PyAudio resources."""
+        self._play_pool.shutdown(wait=False)
+        with self._out_lock:
+            if self._out_stream is not None:
+                self._out_stream.stop_stream()
+                self._out_stream.close()
+                self._out_stream = None
         if self.pyaudio_instance:
             self.pyaudio_instance.terminate()
 
 
-# Convenience functions for backward compatibility
-_tts_instance = None
+# Convenience functions for backward compatibility: one shared instance per
+# (api key, model, voice), so each configuration keeps its warm stream/connection
+_tts_instances = {}
+_tts_instances_lock = threading.Lock()
+
+
+def _close_tts_instances():
+    for tts in _tts_instances.values():
+        tts.close()
+
+
+atexit.register(_close_tts_instances)
 
 
 def get_tts_instance(api_key=None, model="gpt-4o-mini-tts", voice="alloy"):
-    """Get or create a singleton TTS instance."""
-    global _tts_instance
-    if _tts_instance is None:
-        _tts_instance = OpenAITTS(api_key, model, voice)
-    return _tts_instance
+    """Get or create the shared TTS instance for this api key, model and voice."""
+    key = (api_key or os.getenv("OPENAI_API_KEY"), model, voice)
+    with _tts_instances_lock:
+        tts = _tts_instances.get(key)
+        if tts is None:
+            tts = _tts_instances[key] = OpenAITTS(api_key, model, voice)
+    return tts
 
 
 def speak(text, api_key=None, model="gpt-4o-mini-tts", voice="alloy"):
@@ -215,7 +597,7 @@ def speak_async(text, api_key=None, model="gpt-4o-mini-tts", voice="alloy"):
         voice: Voice name (default: "alloy")
         
     Returns:
-        Thread object
+        Future that completes when speech has finished
     """
     tts = get_tts_instance(api_key, model, voice)
     return tts.speak_async(text)
@@ -260,7 +642,7 @@ def speak_from_prompt_async(
         generation_model: Model to use for text generation (default: "gpt-4o-mini")
         
     Returns:
-        Thread object
+        Future that completes when speech has finished
     """
     tts = get_tts_instance(api_key, model, voice)
     return tts.speak_from_prompt_async(prompt, generation_model)
@@ -1,9 +1,7 @@
+import queue
 import subprocess
 import threading
-import random
 from piper import PiperVoice,SynthesisConfig
-import wave
-import os
 
 # voice = PiperVoice.load("./models/en_US-lessac-medium.onnx")
 
@@ -28,15 +26,27 @@ voice = PiperVoice.load(model_path)
 #                 output=True,
 #                 frames_per_buffer=1024)
 
+# Sample rate of `piper --output-raw` for the medium voices used by the CLI helpers
+_PIPER_CLI_RATE = 22050
+
+
+def _aplay_raw_cmd(rate):
+    """aplay command line that plays raw 16-bit mono PCM from stdin."""
+    return ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(rate), "-c", "1"]
+
+
 def speak(text):
-    filename = '{}.wav'.format(random.random())
-    with wave.open(filename, "wb") as wav_file:
-        voice.synthesize_wav(text, wav_file, syn_config=syn_config)
+    # Chunks go to aplay as soon as they are synthesized: no temp WAV file,
+    # and playback starts with the first sentence
+    player = subprocess.Popen(_aplay_raw_cmd(voice.config.sample_rate), stdin=subprocess.PIPE)
     try:
-        subprocess.run(["aplay", "-q", filename], check=True)
-        print(f"Spoke: {text}")
+        for chunk in voice.synthesize(text, syn_config=syn_config):
+            player.stdin.write(chunk.audio_int16_bytes)
     finally:
-        os.unlink(filename)  # delete temp file
+        player.stdin.close()
+    if player.wait() != 0:
+        raise subprocess.CalledProcessError(player.returncode, "aplay")
+    print(f"Spoke: {text}")
 
 
 
@@ -62,20 +72,89 @@ def speak(text):
     #         # If it’s already bytes
     #         stream.write(chunk)
 
-def speak22(text):
-    subprocess.run(
-        ["piper", "--model", "en_US-amy-medium.onnx", "--output", "speech.wav"],
-        input=text.encode("utf-8")
+def _synthesize_raw(text):
+    """Synthesize text to raw 16-bit mono PCM at the voice's sample rate."""
+    return b"".join(
+        chunk.audio_int16_bytes
+        for chunk in voice.synthesize(text, syn_config=syn_config)
     )
-    subprocess.run(["aplay", "speech.wav"])
 
 
-def _speak_worker(text):
+def _play_raw(pcm):
     subprocess.run(
-        ["piper", "--model", "models/piper-voice.onnx", "--output", "speech.wav"],
-        input=text.encode("utf-8")
+        _aplay_raw_cmd(voice.config.sample_rate),
+        input=pcm,
+        check=True,
     )
-    subprocess.run(["aplay", "speech.wav"])
+
+
+def speak_many(phrases):
+    """
+    Speak several phrases in order, synthesizing the next phrase while the
+    current one is playing so synthesis time is hidden behind playback.
+    Blocks until the last phrase has finished playing.
+    """
+    pcm_queue = queue.Queue(maxsize=2)
+    stop = threading.Event()
+
+    def _put(item):
+        # Give up once playback has stopped instead of blocking on a full queue
+        while not stop.is_set():
+            try:
+                pcm_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _synthesize_all():
+        try:
+            for phrase in phrases:
+                if not _put((phrase, _synthesize_raw(phrase))):
+                    return
+            _put(None)  # end of phrases
+        except Exception as e:
+            _put(e)  # re-raised by the player below
+
+    synth_thread = threading.Thread(target=_synthesize_all, daemon=True)
+    synth_thread.start()
+
+    try:
+        while True:
+            item = pcm_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            phrase, pcm = item
+            _play_raw(pcm)
+            print(f"Spoke: {phrase}")
+    finally:
+        stop.set()
+        synth_thread.join()
+
+
+def _pipe_piper_to_aplay(model, text):
+    """Run the piper CLI with its raw output piped straight into aplay."""
+    piper = subprocess.Popen(
+        ["piper", "--model", model, "--output-raw"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    player = subprocess.Popen(_aplay_raw_cmd(_PIPER_CLI_RATE), stdin=piper.stdout)
+    piper.stdout.close()  # aplay holds the only read end now
+    piper.stdin.write(text.encode("utf-8"))
+    piper.stdin.close()
+    player.wait()
+    piper.wait()
+
+
+def speak22(text):
+    _pipe_piper_to_aplay("en_US-amy-medium.onnx", text)
+
+
+def _speak_worker(text):
+    _pipe_piper_to_aplay("models/piper-voice.onnx", text)
 
 def speak_async(text):
     thread = threading.Thread(target=_speak_worker, args=(text,))
@@ -7,7 +7,7 @@ import time
 import math
 import cv2
 import numpy as np
-from picamera2 import Picamera2
+from picamera2 import MappedArray, Picamera2
 from typing import Optional, Tuple
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -123,6 +123,8 @@ class ArUcoFollower:
         angle_kp: float = 1.0,
         angle_ki: float = 0.05,
         angle_kd: float = 0.1,
+        # frames to stay on the locked threshold window after a detection
+        lock_frames: int = 30,
     ):
         self.car = car
         self.marker_id = marker_id
@@ -146,6 +148,8 @@ class ArUcoFollower:
         )
 
         self.picam2: Optional[Picamera2] = None
+        # Grayscale frame reused across captures (filled from the Y plane)
+        self._gray = np.empty((480, 640), dtype=np.uint8)
         self.running = False
         self.follow_thread: Optional[threading.Thread] = None
 
@@ -159,6 +163,16 @@ class ArUcoFollower:
         self.aruco_params.adaptiveThreshWinSizeStep = 5
         self.aruco_params.errorCorrectionRate = 0.8
 
+        # Once the marker is acquired, threshold with a single window sized
+        # to it instead of sweeping ~10 window sizes on every frame
+        self.lock_params = cv2.aruco.DetectorParameters()
+        self.lock_params.adaptiveThreshWinSizeStep = 1
+        self.lock_params.errorCorrectionRate = 0.8
+        self.lock_frames = lock_frames
+        self._lock_frames_left = 0
+        self._last_bbox: Optional[Tuple[int, int, int, int]] = None
+        self._active_params = self.aruco_params
+
         try:
             self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.aruco_params)
             self.use_new_api = True
@@ -203,7 +217,7 @@ class ArUcoFollower:
             self.picam2 = Picamera2()
             self.picam2.configure(
                 self.picam2.create_preview_configuration(
-                    main={"format": "RGB888", "size": (640, 480)}
+                    main={"format": "YUV420", "size": (640, 480)}
                 )
             )
             self.picam2.start()
@@ -230,24 +244,26 @@ class ArUcoFollower:
     # -------------------------------------------------------
 
     def _follow_loop(self):
-        last_seen = time.time()
+        # One monotonic clock read per iteration; times are kept in ns
+        now_ns = time.monotonic_ns()
+        last_seen_ns = now_ns
         lost_timeout = 1.0
-        last_update_time = time.time()
+        last_update_ns = now_ns
 
         while self.running:
-            current_time = time.time()
-            dt = current_time - last_update_time
-            last_update_time = current_time
+            now_ns = time.monotonic_ns()
+            dt = (now_ns - last_update_ns) * 1e-9
+            last_update_ns = now_ns
 
-            frame = self.picam2.capture_array()
-            if frame is None:
+            gray = self._capture_gray()
+            if gray is None:
                 print("Camera returned NULL frame.")
                 break
 
-            found, tvec = self._detect_marker_pose(frame)
+            found, tvec = self._detect_marker_pose(gray)
 
             if found:
-                last_seen = time.time()
+                last_seen_ns = now_ns
 
                 tx, ty, tz = tvec.flatten()
 
@@ -276,7 +292,7 @@ class ArUcoFollower:
 
             else:
                 # If lost for a while, stop safely and reset PID controllers
-                if time.time() - last_seen > lost_timeout:
+                if (now_ns - last_seen_ns) * 1e-9 > lost_timeout:
                     self.car.drive(0, 0, 0)
                     self.distance_pid.reset()
                     self.angle_pid.reset()
@@ -285,20 +301,72 @@ class ArUcoFollower:
 
             # time.sleep(0.01)
 
+    def _capture_gray(self) -> Optional[np.ndarray]:
+        """
+        Copy the Y plane of the next frame into the reusable gray buffer.
+
+        Reads straight from the mapped DMA buffer of the request, skipping the
+        full-frame copy capture_array() makes. The returned array is reused on
+        the next call.
+        """
+        request = self.picam2.capture_request()
+        if request is None:
+            return None
+        try:
+            with MappedArray(request, "main") as m:
+                # YUV420 rows are stride bytes wide; the first `height` rows are Y
+                height, width = self._gray.shape
+                np.copyto(self._gray, m.array[:height, :width])
+        finally:
+            request.release()
+        return self._gray
+
     # -------------------------------------------------------
     # POSE DETECTION
     # -------------------------------------------------------
 
-    def _detect_marker_pose(self, frame) -> Tuple[bool, Optional[np.ndarray]]:
-        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-
+    def _select_detector_params(self):
+        """Use the locked single-window parameters while the marker is tracked."""
+        if self._last_bbox is not None and self._lock_frames_left > 0:
+            self._lock_frames_left -= 1
+            params = self.lock_params
+        else:
+            self._last_bbox = None
+            params = self.aruco_params
+
+        if params is not self._active_params:
+            self._active_params = params
+            if self.use_new_api:
+                self.detector.setDetectorParameters(params)
+        return params
+
+    def _lock_on_marker(self, marker_corners):
+        """Size the threshold window from the marker's pixel size and lock it."""
+        x, y, w, h = cv2.boundingRect(marker_corners.reshape(4, 2).astype(np.float32))
+        self._last_bbox = (x, y, w, h)
+        self._lock_frames_left = self.lock_frames
+
+        # 6x6 bits plus a one-cell border -> 8 cells across; a window about two
+        # cells wide separates black and white cells reliably
+        cell = max(w, h) / 8.0
+        win = int(np.clip(2 * cell, 3, 53)) | 1
+        self.lock_params.adaptiveThreshWinSizeMin = win
+        self.lock_params.adaptiveThreshWinSizeMax = win
+
+        # Parameters are copied into the detector, so push the new window size
+        if self.use_new_api and self._active_params is self.lock_params:
+            self.detector.setDetectorParameters(self.lock_params)
+
+    def _detect_marker_pose(self, gray) -> Tuple[bool, Optional[np.ndarray]]:
         # ArUco detection
+        params = self._select_detector_params()
         if self.use_new_api:
             corners, ids, _ = self.detector.detectMarkers(gray)
         else:
-            corners, ids, _ = cv2.aruco.detectMarkers(gray, self.aruco_dict, self.aruco_params)
+            corners, ids, _ = cv2.aruco.detectMarkers(gray, self.aruco_dict, parameters=params)
 
         if ids is None or len(ids) == 0:
+            self._last_bbox = None
             return False, None
 
         # Find correct marker
@@ -307,8 +375,11 @@ class ArUcoFollower:
                 marker_corners = corners[i]
                 break
         else:
+            self._last_bbox = None
             return False, None
 
+        self._lock_on_marker(marker_corners)
+
         # ---- 3D pose estimation ----
         # rvec, tvec, _ = cv2.aruco.estimatePoseSingleMarkers(
         #     marker_corners,
@@ -1,18 +1,71 @@
+import mmap
+import os
+import queue
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
 import picamera2
 
 
 #This class is a wrapper around the picamera2 library.
 # and manages the camera from one place.
 class Camera:
-    def __init__(self):
+    def __init__(self, width: int = 640, height: int = 480, warm: bool = True):
+        self.width = width
+        self.height = height
         self.camera = picamera2.Picamera2()
+        # YUV420 so grayscale consumers (ArUco) can use the Y plane directly.
+        # Two buffers keep at most one frame queued behind the one being read,
+        # so captures are never more than a frame stale.
         self.camera.configure(
             self.camera.create_preview_configuration(
-                main={"format": "RGB888", "size": (640, 480)}
+                main={"format": "YUV420", "size": (width, height)},
+                buffer_count=2,
             )
         )
+        self._stride = self.camera.camera_configuration()["main"]["stride"]
+        self._main_stream = self.camera.stream_map["main"]
+        self._gray_request = None
+        self._plane_maps = {}
+        # Colour frames are converted into this one buffer instead of a new array
+        self._frame = np.empty((height, width, 3), dtype=np.uint8)
+        # Contiguous I420 copy, only used when rows are padded (stride > width)
+        self._yuv = None
+        if self._stride != width:
+            self._yuv = np.empty((height * 3 // 2, width), dtype=np.uint8)
         self.camera.start()
+        if warm:
+            self.warm()
         self.running = False
+
+    def warm(self, min_frames: int = 5, max_frames: int = 30, tolerance: float = 0.02):
+        """
+        Let auto-exposure and white balance settle, then lock them.
+
+        The first frames after start() are several times slower while AE/AWB
+        converge. Settling here keeps that off the first capture in user code
+        (e.g. straight after a wake word), and the locked exposure skips the
+        per-frame 3A adjustments from then on.
+        """
+        metadata = {}
+        last_exposure = None
+        for i in range(max_frames):
+            metadata = self.camera.capture_metadata()
+            exposure = metadata.get("ExposureTime")
+            settled = (last_exposure and exposure
+                       and abs(exposure - last_exposure) <= tolerance * last_exposure)
+            if i + 1 >= min_frames and settled:
+                break
+            last_exposure = exposure
+
+        controls = {"AeEnable": False, "AwbEnable": False}
+        for key in ("ExposureTime", "AnalogueGain", "ColourGains"):
+            if key in metadata:
+                controls[key] = metadata[key]
+        self.camera.set_controls(controls)
+
     def start(self):
         if self.running:
             return
@@ -23,6 +76,7 @@ class Camera:
         if not self.running:
             return
         self.running = False
+        self._release_gray()
         self.camera.stop()
 
     def is_available(self) -> bool:
@@ -31,10 +85,92 @@ class Camera:
         return self.camera.is_available()
 
     def capture_frame(self):
+        """
+        Capture a BGR frame (converted from the YUV420 stream).
+
+        The frame is written into a buffer owned by the Camera and returned
+        as-is, so it is overwritten by the next capture_frame() or
+        capture_latest(). Callers that keep a frame across calls must copy it.
+        """
+        if not self.running:
+            return None
+        # Hand back a buffer still held by capture_gray(), or with only two
+        # buffers the camera has none left to fill
+        self._release_gray()
+        return self._request_to_frame(self.camera.capture_request())
+
+    def capture_latest(self):
+        """
+        Capture a BGR frame that started exposing after this call.
+
+        Like capture_frame(), the result lives in the Camera's reusable buffer.
+
+        Any frame already completed and waiting in the queue is dropped, so the
+        result reflects the scene now rather than when the caller last read.
+        This favours latency over throughput: the call may wait up to one
+        frame interval instead of returning a queued frame immediately.
+        """
+        if not self.running:
+            return None
+        self._release_gray()
+        return self._request_to_frame(self.camera.capture_request(flush=True))
+
+    def _request_to_frame(self, request):
+        """Convert the request's YUV420 buffer in place into the reusable frame."""
+        try:
+            with picamera2.MappedArray(request, "main") as m:
+                yuv = m.array if self._yuv is None else self._pack_i420(m.array)
+                # Keep whatever cvtColor returns: it reallocates dst on a mismatch
+                self._frame = cv2.cvtColor(yuv, cv2.COLOR_YUV420p2BGR, dst=self._frame)
+        finally:
+            request.release()
+        return self._frame
+
+    def _pack_i420(self, padded):
+        """Copy a stride-padded YUV420 buffer into the contiguous width-wide one."""
+        h, w, stride = self.height, self.width, self._stride
+        src = padded.reshape(-1)
+        dst = self._yuv.reshape(-1)
+        # Y plane, then U and V at half resolution with half the stride
+        dst[:h * w].reshape(h, w)[:] = src[:h * stride].reshape(h, stride)[:, :w]
+        src_off, dst_off = h * stride, h * w
+        for _ in range(2):
+            plane = src[src_off:src_off + (h // 2) * (stride // 2)].reshape(h // 2, stride // 2)
+            dst[dst_off:dst_off + (h // 2) * (w // 2)].reshape(h // 2, w // 2)[:] = plane[:, :w // 2]
+            src_off += (h // 2) * (stride // 2)
+            dst_off += (h // 2) * (w // 2)
+        return self._yuv
+
+    def capture_gray(self):
+        """
+        Return the luminance (Y) plane of the next frame without copying it.
+
+        This is the preferred capture for ArUco detection, which only needs a
+        single-channel uint8 image. The array is a view onto the camera's
+        buffer and stays valid until the next capture call or stop().
+        """
         if not self.running:
             return None
-        return self.camera.capture_array()
-    
+        self._release_gray()
+        request = self.camera.capture_request()
+        self._gray_request = request
+
+        plane = request.request.buffers[self._main_stream].planes[0]
+        mapped = self._plane_maps.get(plane.fd)
+        if mapped is None:
+            # libcamera cycles through a few buffers; map each one only once
+            mapped = mmap.mmap(plane.fd, self._stride * self.height,
+                               mmap.MAP_SHARED, mmap.PROT_READ)
+            self._plane_maps[plane.fd] = mapped
+
+        y_plane = np.frombuffer(mapped, dtype=np.uint8, count=self._stride * self.height)
+        return y_plane.reshape((self.height, self._stride))[:, :self.width]
+
+    def _release_gray(self):
+        if self._gray_request is not None:
+            self._gray_request.release()
+            self._gray_request = None
+
     def capture_image(self, filename: str = "imgs/captured_image.jpg"):
         if not self.running:
             return
@@ -44,4 +180,93 @@ class Camera:
         if not self.running:
             return
         self.running = False
-        self.camera.close()
\ No newline at end of file
+        self._release_gray()
+        for mapped in self._plane_maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # a caller still holds a capture_gray() view; unmapped when it goes
+        self._plane_maps.clear()
+        self.camera.close()
+
+
+class CameraThread(threading.Thread):
+    """
+    Captures frames on a background thread so capture overlaps processing.
+
+    Only the newest frame is kept: frames go into a one-slot queue and a stale
+    frame still waiting there is evicted when the next one arrives. Consumers
+    call latest(), or wait_new() to process each frame once. Frames are
+    copies, so they stay valid after later captures.
+    """
+
+    def __init__(self, camera: Camera, gray: bool = True, cpu: Optional[int] = None):
+        """
+        :param camera: Started Camera to read from
+        :param gray: Capture the Y plane (for ArUco) instead of BGR frames
+        :param cpu: Core to pin the capture thread to, away from the consumer
+        """
+        super().__init__(daemon=True)
+        self.camera = camera
+        self.gray = gray
+        self.cpu = cpu
+        self.frames = queue.Queue(maxsize=1)
+        self._stop_event = threading.Event()
+        self._last = None
+
+    def run(self):
+        if self.cpu is not None and hasattr(os, "sched_setaffinity"):
+            # pid 0 is the calling thread on Linux
+            os.sched_setaffinity(0, {self.cpu})
+
+        capture = self.camera.capture_gray if self.gray else self.camera.capture_frame
+        while not self._stop_event.is_set():
+            frame = capture()
+            if frame is None:
+                self._stop_event.wait(0.05)
+                continue
+            # capture_* reuse their buffers; queued frames need their own copy
+            frame = frame.copy()
+            try:
+                self.frames.put_nowait(frame)
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+                self.frames.put_nowait(frame)
+
+    def latest(self, timeout: float = 1.0):
+        """
+        Return the newest frame without waiting if one is ready.
+
+        Falls back to the previously returned frame when no new frame has
+        arrived; only blocks (up to `timeout`) before the very first frame.
+        """
+        try:
+            self._last = self.frames.get_nowait()
+        except queue.Empty:
+            if self._last is None:
+                try:
+                    self._last = self.frames.get(timeout=timeout)
+                except queue.Empty:
+                    return None
+        return self._last
+
+    def wait_new(self, timeout: float = 1.0):
+        """
+        Block until a frame newer than the last one returned arrives.
+
+        :param timeout: Seconds to wait for it
+        :return: The new frame, or None on timeout
+        """
+        try:
+            self._last = self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return self._last
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=2.0)
@@ -1,16 +1,54 @@
 from picamera2 import Picamera2
-import time
 
-# Initialize camera
-picam2 = Picamera2()
-picam2.start_preview()  # Optional, opens a preview window
-time.sleep(2)  # Allow camera to adjust
+# libcamera reports AeState/AwbState == 2 once the algorithm has converged
+_CONVERGED = 2
+# Safety cap on frames to wait for auto-exposure/white balance to settle
+_MAX_SETTLE_FRAMES = 30
 
-# Capture image
-image = picam2.capture_array()  # Returns a numpy array
-# Save image using OpenCV or PIL
-import cv2
-cv2.imwrite("image.jpg", image)
+# Same frame size the old preview-configuration capture produced
+_SIZE = (640, 480)
 
-# Stop preview
-picam2.stop_preview()
+# One configured and started camera per process: later captures skip setup
+_picam2 = None
+
+
+def _wait_converged(picam2):
+    """Wait for AE/AWB to converge instead of sleeping a fixed time."""
+    last_exposure = None
+    for _ in range(_MAX_SETTLE_FRAMES):
+        md = picam2.capture_metadata()
+        if "AeState" in md:
+            if md["AeState"] == _CONVERGED and md.get("AwbState", _CONVERGED) == _CONVERGED:
+                return
+        else:
+            # Older libcamera without AeState: settle on a stable exposure
+            exposure = md.get("ExposureTime")
+            if last_exposure and exposure and abs(exposure - last_exposure) <= 0.02 * last_exposure:
+                return
+            last_exposure = exposure
+
+
+def get_camera():
+    """Return the shared camera, configuring and starting it on first use."""
+    global _picam2
+    if _picam2 is None:
+        # Still configuration at 640x480, headless: no preview window
+        _picam2 = Picamera2()
+        _picam2.configure(
+            _picam2.create_still_configuration(main={"size": _SIZE}, buffer_count=2)
+        )
+        _picam2.start()
+        _wait_converged(_picam2)
+    return _picam2
+
+
+def capture(filename="image.jpg"):
+    # Capture straight to JPEG: Picamera2 encodes from the capture request
+    # itself, with no numpy array handed to OpenCV for a second encode
+    get_camera().capture_file(filename)
+
+
+if __name__ == "__main__":
+    capture("image.jpg")
+    _picam2.stop()
+    _picam2.close()
@@ -1,39 +1,229 @@
+import time
+
 import cv2
 import cv2.aruco as aruco
+import numpy as np
+
+# Grayscale scratch buffer reused across calls on colour frames (sized lazily)
+_GRAY = None
+
+# Markers are segmented on a downscaled copy; corners are mapped back after
+_DETECT_SCALE = 0.5
+_SMALL = None
+
+# A marker's black border and cells always put some dark pixels in the frame.
+# Below this fraction of pixels darker than _DARK_LEVEL the detector is skipped
+# (tune by sampling frames with and without a marker in view).
+_DARK_LEVEL = 80
+_MIN_DARK_RATIO = 0.02
+
+# Dictionary, parameters and detectors are built once at import, not per call
+# Use 6x6 dictionary (250 possible markers)
+_ARUCO_DICT = aruco.getPredefinedDictionary(aruco.DICT_6X6_50)
+
+# Coarse pass: few threshold windows, default error correction, no refinement.
+# Cheap enough to run on every frame, most of which contain no marker.
+_PARAMS_FAST = aruco.DetectorParameters()
+_PARAMS_FAST.adaptiveThreshWinSizeMin = 3
+_PARAMS_FAST.adaptiveThreshWinSizeMax = 15
+_PARAMS_FAST.errorCorrectionRate = 0.6
+_PARAMS_FAST.cornerRefinementMethod = aruco.CORNER_REFINE_NONE
+
+# Accurate pass, when the coarse pass saw candidates but decoded none and either
+# a marker was seen moments ago (likely lost to glare/blur) or, to still catch
+# markers the coarse pass never decodes, at most every _ACCURATE_INTERVAL
+_LOSS_WINDOW = 1.0
+_ACCURATE_INTERVAL = 0.5
+_last_seen = float("-inf")
+_last_accurate = float("-inf")
+
+_PARAMS_ACCURATE = aruco.DetectorParameters()
+# 1. Adaptive Thresholding:
+# Look at a wider range of window sizes. This helps if the glare dominates small windows.
+_PARAMS_ACCURATE.adaptiveThreshWinSizeMin = 3
+_PARAMS_ACCURATE.adaptiveThreshWinSizeMax = 50  # Increase max window size
+_PARAMS_ACCURATE.adaptiveThreshWinSizeStep = 5
+
+# 2. Error Correction:
+# Increase the error correction rate. ArUco has redundancy; this tells it
+# to "guess" more aggressively if a few bits (like the ones under glare) are wrong.
+_PARAMS_ACCURATE.errorCorrectionRate = 0.8  # Default is usually around 0.6
+_PARAMS_ACCURATE.cornerRefinementMethod = aruco.CORNER_REFINE_NONE
+
+# ArucoDetector (OpenCV 4.7+) keeps the parameters on the C++ side
+try:
+    _DETECTOR_FAST = aruco.ArucoDetector(_ARUCO_DICT, _PARAMS_FAST)
+    _DETECTOR_ACCURATE = aruco.ArucoDetector(_ARUCO_DICT, _PARAMS_ACCURATE)
+except AttributeError:
+    _DETECTOR_FAST = _DETECTOR_ACCURATE = None
+
+# Every DICT_6X6_50 code (36 bits) packed into a uint64, for all 4 rotations:
+# nearest-marker lookup is one XOR + popcount over a (50, 4) table
+_MARKER_BITS = 6
+_CELL_PX = 8
+
+
+def _pack_bits(bits):
+    """Pack a 0/1 bit matrix (row-major, first bit most significant) into an int."""
+    code = 0
+    for b in bits.flatten():
+        code = (code << 1) | int(b)
+    return code
+
+
+_CODES = np.array([
+    [_pack_bits(np.rot90(aruco.Dictionary.getBitsFromByteList(
+        _ARUCO_DICT.bytesList[i:i + 1], _MARKER_BITS), k)) for k in range(4)]
+    for i in range(len(_ARUCO_DICT.bytesList))
+], dtype=np.uint64)
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count  # NumPy 2.0+
+else:
+    def _popcount(x):
+        x = np.ascontiguousarray(x)
+        return np.unpackbits(x.view(np.uint8)).reshape(x.shape + (64,)).sum(axis=-1)
+
+# Corners are refined on the full-res image, in small windows around each one
+_SUBPIX_WINDOW = (5, 5)
+_SUBPIX_CRITERIA = (cv2.TERM_CRITERIA_COUNT + cv2.TERM_CRITERIA_EPS, 30, 0.01)
+
 
-def detect_aruco(image_path):
-    # Load image
-    image = cv2.imread(image_path)
-    if image is None:
-        print(f"Error: Could not read image from {image_path}")
-        return
+def _to_gray(image):
+    """Load or convert `image` (a path or a BGR/gray frame) to grayscale."""
+    global _GRAY
+    if isinstance(image, str):
+        # Decode straight to one channel: no BGR decode + cvtColor round trip
+        return cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+    if image.ndim == 2:
+        return image
+    if _GRAY is None or _GRAY.shape != image.shape[:2]:
+        _GRAY = np.empty(image.shape[:2], dtype=np.uint8)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=_GRAY)
 
-    # Convert to grayscale (Aruco detection works on grayscale)
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-    # Use 6x6 dictionary (250 possible markers)
-    aruco_dict = aruco.getPredefinedDictionary(aruco.DICT_6X6_50)
-    parameters = aruco.DetectorParameters()
+def _downscale(gray):
+    """Shrink `gray` by _DETECT_SCALE into a reusable buffer (INTER_AREA)."""
+    global _SMALL
+    h, w = gray.shape
+    size = (int(w * _DETECT_SCALE), int(h * _DETECT_SCALE))
+    if _SMALL is None or _SMALL.shape != (size[1], size[0]):
+        _SMALL = np.empty((size[1], size[0]), dtype=np.uint8)
+    return cv2.resize(gray, size, dst=_SMALL, interpolation=cv2.INTER_AREA)
 
-        # 1. Adaptive Thresholding: 
-    # Look at a wider range of window sizes. This helps if the glare dominates small windows.
-    parameters.adaptiveThreshWinSizeMin = 3
-    parameters.adaptiveThreshWinSizeMax = 50  # Increase max window size
-    parameters.adaptiveThreshWinSizeStep = 5 
 
-    # 2. Error Correction:
-    # Increase the error correction rate. ArUco has redundancy; this tells it 
-    # to "guess" more aggressively if a few bits (like the ones under glare) are wrong.
-    parameters.errorCorrectionRate = 0.8  # Default is usually around 0.6
+def _detect(small, detector, params):
+    if detector is not None:
+        return detector.detectMarkers(small)
+    return aruco.detectMarkers(small, _ARUCO_DICT, parameters=params)
 
-    # Detect markers
-    corners, ids, rejected = aruco.detectMarkers(gray, aruco_dict, parameters=parameters)
+
+def _refine_corners(gray, corners):
+    """Map corners back to full resolution and refine them to sub-pixel accuracy."""
+    refined = []
+    for c in corners:
+        pts = (c / _DETECT_SCALE).reshape(-1, 1, 2)
+        # Only the pixels in the window around each corner are touched
+        cv2.cornerSubPix(gray, pts, _SUBPIX_WINDOW, (-1, -1), _SUBPIX_CRITERIA)
+        refined.append(pts.reshape(c.shape))
+    return tuple(refined)
+
+
+def _read_bits(gray, marker_corners):
+    """Read the inner bit grid of a marker from the full-res image (white = 1)."""
+    cells = _MARKER_BITS + 2  # inner bits plus the one-cell black border
+    side = cells * _CELL_PX
+    square = np.array([[0, 0], [side - 1, 0], [side - 1, side - 1], [0, side - 1]],
+                      dtype=np.float32)
+    transform = cv2.getPerspectiveTransform(
+        marker_corners.reshape(4, 2).astype(np.float32), square)
+    warped = cv2.warpPerspective(gray, transform, (side, side))
+    _, binary = cv2.threshold(warped, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    cell_means = binary.reshape(cells, _CELL_PX, cells, _CELL_PX).mean(axis=(1, 3))
+    return (cell_means[1:-1, 1:-1] > 0.5).astype(np.uint8)
+
+
+def match_code(bits):
+    """Return (marker_id, bit_errors) of the closest dictionary marker in any rotation."""
+    distances = _popcount(_CODES ^ np.uint64(_pack_bits(bits)))
+    best = int(np.argmin(distances))
+    return best // 4, int(distances.flat[best])
+
+
+def _verify_markers(gray, corners, ids):
+    """Drop markers whose full-res bits decode to a different ID than reported."""
+    keep = [i for i, (c, mid) in enumerate(zip(corners, ids.flatten()))
+            if match_code(_read_bits(gray, c))[0] == mid]
+    if not keep:
+        return (), None
+    return tuple(corners[i] for i in keep), ids[keep]
+
+
+def detect_aruco(image):
+    global _last_seen, _last_accurate
+    # Load image (a file path, or a frame already in memory)
+    gray = _to_gray(image)
+    if gray is None:
+        print(f"Error: Could not read image from {image}")
+        return (), None
+
+    # Detect markers on a half-size copy: adaptive thresholding dominates the
+    # detect pass and its cost scales with the pixel count
+    small = _downscale(gray)
+
+    # Cheap gate: no dark region means no marker, so skip thresholding entirely
+    if np.count_nonzero(small < _DARK_LEVEL) < _MIN_DARK_RATIO * small.size:
+        print("No Aruco markers detected.")
+        return (), None
+
+    corners, ids, rejected = _detect(small, _DETECTOR_FAST, _PARAMS_FAST)
+    now = time.monotonic()
+    accurate = (ids is None and len(rejected) > 0
+                and (now - _last_seen < _LOSS_WINDOW
+                     or now - _last_accurate >= _ACCURATE_INTERVAL))
+    if accurate:
+        _last_accurate = now
+        corners, ids, rejected = _detect(small, _DETECTOR_ACCURATE, _PARAMS_ACCURATE)
 
     if ids is not None:
+        corners = _refine_corners(gray, corners)
+        if accurate:
+            # errorCorrectionRate 0.8 can mis-identify; re-check at full res
+            corners, ids = _verify_markers(gray, corners, ids)
+
+    if ids is not None:
+        _last_seen = now
         print(f"Detected {len(ids)} marker(s) with IDs: {ids.flatten()}")
     else:
         print("No Aruco markers detected.")
+    return corners, ids
+
+if __name__ == "__main__":
+    import os
+    import sys
 
-# Example usage:
-image_path = "captured_image2.jpg"  # Replace with your image path
-detect_aruco(image_path)
+    if len(sys.argv) > 1 and sys.argv[1] == "live":
+        # Capture on core 3 while detection runs on the other cores
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from vision.camera import Camera, CameraThread
+
+        camera = Camera()
+        camera.start()
+        capture_thread = CameraThread(camera, gray=True, cpu=3)
+        capture_thread.start()
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, {0, 1, 2})
+        try:
+            while True:
+                frame = capture_thread.wait_new()
+                if frame is not None:
+                    detect_aruco(frame)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            capture_thread.stop()
+            camera.close()
+    else:
+        # Example usage:
+        image_path = sys.argv[1] if len(sys.argv) > 1 else "captured_image2.jpg"  # Replace with your image path
+        detect_aruco(image_path)